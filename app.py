@@ -2,7 +2,7 @@
 from dotenv import load_dotenv
 load_dotenv()  # 这行必须在导入其他模块之前！
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Blueprint, Response, current_app, render_template, request, jsonify, session, redirect, url_for
 from flask_cors import CORS
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -12,24 +12,27 @@ import json
 import os
 import secrets
 
-app = Flask(__name__)
-CORS(app)
+bp = Blueprint('main', __name__)
 
-# 安全的密钥生成
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(32))
-app.config['UPLOAD_FOLDER'] = 'static/uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
+# 未设置 SECRET_KEY 时，由 init-db 生成并保存在这里，所有 worker 共用同一个密钥
+SECRET_KEY_FILE = '.secret_key'
 
-# 确保上传文件夹存在
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'photos'), exist_ok=True)
-
-# 数据库初始化
+# 数据库初始化（建表 + 默认用户，共用一个连接）
 def init_db():
     conn = sqlite3.connect('database.db')
     c = conn.cursor()
     
+    create_tables(c)
+    create_default_user(c)
+    
+    conn.commit()
+    conn.close()
+
+# 建表（只建表结构，不创建默认用户）
+def create_tables(c):
+    # 新建数据库时启用增量 VACUUM（已有数据库由 maintenance.py optimize 切换）
+    c.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    
     # 创建用户表（新增）
     c.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -73,15 +76,9 @@ def init_db():
             FOREIGN KEY (place_id) REFERENCES places (id)
         )
     ''')
-    
-    conn.commit()
-    conn.close()
 
 # 创建默认用户（首次运行时）
-def create_default_user():
-    conn = sqlite3.connect('database.db')
-    c = conn.cursor()
-    
+def create_default_user(c):
     # 检查是否已存在默认用户
     c.execute("SELECT id FROM users WHERE username = ?", ('339233',))
     if not c.fetchone():
@@ -94,16 +91,12 @@ def create_default_user():
             VALUES (?, ?, ?)
         ''', ('339233', password_hash, '刘等等'))
         
-        conn.commit()
-        
         # 如果使用了随机密码，打印出来
         if 'DEFAULT_PASSWORD' not in os.environ:
             print(f"默认用户已创建！")
             print(f"用户名: 339233")
             print(f"密码: {default_password}")
             print(f"请保存此密码并在 .env 文件中设置 DEFAULT_PASSWORD")
-    
-    conn.close()
 
 # 登录装饰器
 def login_required(f):
@@ -115,217 +108,21 @@ def login_required(f):
     return decorated_function
 
 # 路由：登录页面
-@app.route('/login')
+@bp.route('/login')
 def login_page():
     if 'user_id' in session:
-        return redirect(url_for('index'))
-    return '''
-    <!DOCTYPE html>
-    <html lang="zh-CN">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>登录 - 我们的探店地图</title>
-        <style>
-            body {
-                margin: 0;
-                padding: 0;
-                height: 100vh;
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                background: url('/static/images/login-bg.png') center/cover no-repeat;
-                position: relative;
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            }
-            
-            body::before {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: 0;
-                right: 0;
-                bottom: 0;
-                background: rgba(0, 0, 0, 0.3);
-                z-index: 1;
-            }
-            
-            .login-container {
-                background: rgba(255, 255, 255, 0.95);
-                padding: 40px;
-                border-radius: 20px;
-                box-shadow: 0 8px 32px rgba(31, 38, 135, 0.37);
-                width: 100%;
-                max-width: 400px;
-                position: relative;
-                z-index: 2;
-                backdrop-filter: blur(10px);
-            }
-            
-            .login-title {
-                text-align: center;
-                color: #764ba2;
-                margin-bottom: 30px;
-                font-size: 24px;
-            }
-            
-            .login-emoji {
-                text-align: center;
-                font-size: 60px;
-                margin-bottom: 20px;
-                animation: heartbeat 1.5s ease-in-out infinite;
-            }
-            
-            .login-emoji img {
-                transition: all 0.3s ease;
-            }
-            
-            @keyframes heartbeat {
-                0%, 100% { transform: scale(1); }
-                50% { transform: scale(1.1); }
-            }
-            
-            .form-group {
-                margin-bottom: 20px;
-            }
-            
-            .form-label {
-                display: block;
-                margin-bottom: 8px;
-                color: #666;
-                font-size: 14px;
-            }
-            
-            .form-input {
-                width: 100%;
-                padding: 12px;
-                border: 2px solid #f093fb;
-                border-radius: 10px;
-                font-size: 16px;
-                box-sizing: border-box;
-                transition: all 0.3s;
-            }
-            
-            .form-input:focus {
-                outline: none;
-                border-color: #764ba2;
-                box-shadow: 0 0 10px rgba(240, 147, 251, 0.3);
-            }
-            
-            .login-btn {
-                width: 100%;
-                padding: 14px;
-                background: linear-gradient(45deg, #f093fb 0%, #f5576c 100%);
-                color: white;
-                border: none;
-                border-radius: 10px;
-                font-size: 16px;
-                cursor: pointer;
-                transition: all 0.3s;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .login-btn:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 5px 20px rgba(240, 147, 251, 0.4);
-            }
-            
-            .error-msg {
-                color: #f5576c;
-                text-align: center;
-                margin-top: 10px;
-                display: none;
-                animation: shake 0.5s;
-            }
-            
-            @keyframes shake {
-                0%, 100% { transform: translateX(0); }
-                25% { transform: translateX(-10px); }
-                75% { transform: translateX(10px); }
-            }
-            
-            @media (max-width: 500px) {
-                .login-container {
-                    margin: 20px;
-                    padding: 30px 20px;
-                }
-            }
-        </style>
-    </head>
-    <body>
-        <div class="login-container">
-            <div class="login-emoji">
-                <img id="loginIcon" 
-                     src="/static/images/title_log.png" 
-                     style="width: 120px; height: 120px; border-radius: 10px;">
-            </div>
-            <h2 class="login-title">欢迎来到秘密基地哇～</h2>
-            <form id="loginForm">
-                <div class="form-group">
-                    <label class="form-label">账号</label>
-                    <input type="text" class="form-input" id="username" required>
-                </div>
-                <div class="form-group">
-                    <label class="form-label">密码</label>
-                    <input type="password" class="form-input" id="password" required
-                           onfocus="changeLoginImage(true)"
-                           onblur="changeLoginImage(false)">
-                </div>
-                <button type="submit" class="login-btn">登录</button>
-                <div class="error-msg" id="errorMsg"></div>
-            </form>
-        </div>
-        
-        <script>
-            function changeLoginImage(isFocused) {
-                const loginIcon = document.getElementById('loginIcon');
-                if (isFocused) {
-                    loginIcon.src = '/static/images/login-hide-eyes.png';
-                } else {
-                    loginIcon.src = '/static/images/title_log.png';
-                }
-            }
-            
-            document.getElementById('loginForm').onsubmit = async (e) => {
-                e.preventDefault();
-                const username = document.getElementById('username').value;
-                const password = document.getElementById('password').value;
-                
-                try {
-                    const response = await fetch('/api/login', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ username, password })
-                    });
-                    
-                    const data = await response.json();
-                    
-                    if (response.ok) {
-                        window.location.href = '/';
-                    } else {
-                        document.getElementById('errorMsg').style.display = 'block';
-                        document.getElementById('errorMsg').textContent = data.error || '登录失败';
-                    }
-                } catch (error) {
-                    document.getElementById('errorMsg').style.display = 'block';
-                    document.getElementById('errorMsg').textContent = '网络错误，请重试';
-                }
-            };
-        </script>
-    </body>
-    </html>
-    '''
+        return redirect(url_for('main.index'))
+    return Response(current_app.config['LOGIN_PAGE_BYTES'], mimetype='text/html')
 
 # 路由：主页面（需要登录）
-@app.route('/')
+@bp.route('/')
 def index():
     if 'user_id' not in session:
-        return redirect(url_for('login_page'))
+        return redirect(url_for('main.login_page'))
     return render_template('index.html')
 
 # API: 登录
-@app.route('/api/login', methods=['POST'])
+@bp.route('/api/login', methods=['POST'])
 def api_login():
     data = request.json
     username = data.get('username')
@@ -356,13 +153,13 @@ def api_login():
     return jsonify({'error': '账号或密码错误'}), 401
 
 # API: 登出
-@app.route('/api/logout', methods=['POST'])
+@bp.route('/api/logout', methods=['POST'])
 def api_logout():
     session.clear()
     return jsonify({'success': True})
 
 # API: 获取当前用户信息
-@app.route('/api/user')
+@bp.route('/api/user')
 @login_required
 def get_user():
     return jsonify({
@@ -371,7 +168,7 @@ def get_user():
     })
 
 # API: 获取所有地点（需要登录）
-@app.route('/api/places', methods=['GET'])
+@bp.route('/api/places', methods=['GET'])
 @login_required
 def get_places():
     conn = sqlite3.connect('database.db')
@@ -417,7 +214,7 @@ def get_places():
 
 
 # API: 添加新地点（需要登录）
-@app.route('/api/places', methods=['POST'])
+@bp.route('/api/places', methods=['POST'])
 @login_required
 def add_place():
     data = request.json
@@ -461,7 +258,7 @@ def add_place():
 
 
 # API: 更新地点（需要登录且是创建者）
-@app.route('/api/places/<int:place_id>', methods=['PUT'])
+@bp.route('/api/places/<int:place_id>', methods=['PUT'])
 @login_required
 def update_place(place_id):
     conn = sqlite3.connect('database.db')
@@ -495,7 +292,7 @@ def update_place(place_id):
     return jsonify({'success': True})
 
 # API: 删除地点（需要登录且是创建者）
-@app.route('/api/places/<int:place_id>', methods=['DELETE'])
+@bp.route('/api/places/<int:place_id>', methods=['DELETE'])
 @login_required
 def delete_place(place_id):
     conn = sqlite3.connect('database.db')
@@ -516,7 +313,7 @@ def delete_place(place_id):
 
 
 # API: 获取地点的留言
-@app.route('/api/places/<int:place_id>/messages', methods=['GET'])
+@bp.route('/api/places/<int:place_id>/messages', methods=['GET'])
 @login_required
 def get_messages(place_id):
     conn = sqlite3.connect('database.db')
@@ -551,7 +348,7 @@ def get_messages(place_id):
     return jsonify(messages)
 
 # API: 添加留言
-@app.route('/api/places/<int:place_id>/messages', methods=['POST'])
+@bp.route('/api/places/<int:place_id>/messages', methods=['POST'])
 @login_required
 def add_message(place_id):
     data = request.json
@@ -590,7 +387,7 @@ def add_message(place_id):
     })
 
 # API: 删除留言
-@app.route('/api/messages/<int:message_id>', methods=['DELETE'])
+@bp.route('/api/messages/<int:message_id>', methods=['DELETE'])
 @login_required
 def delete_message(message_id):
     conn = sqlite3.connect('database.db')
@@ -614,7 +411,7 @@ def delete_message(message_id):
     return jsonify({'success': True})
 
 # API: 导出数据
-@app.route('/api/export')
+@bp.route('/api/export')
 @login_required
 def export_data():
     conn = sqlite3.connect('database.db')
@@ -656,7 +453,7 @@ def export_data():
     return response
 
 # API: 导入数据
-@app.route('/api/import', methods=['POST'])
+@bp.route('/api/import', methods=['POST'])
 @login_required
 def import_data():
     try:
@@ -719,7 +516,7 @@ def import_data():
         return jsonify({'error': f'导入失败: {str(e)}'}), 500
     
 # API: 获取统计数据
-@app.route('/api/stats', methods=['GET'])
+@bp.route('/api/stats', methods=['GET'])
 @login_required
 def get_stats():
     conn = sqlite3.connect('database.db')
@@ -740,8 +537,67 @@ def get_stats():
         'completion_rate': round((visited / (want_to_go + visited) * 100) if (want_to_go + visited) > 0 else 0, 1)
     })
 
-init_db()
-create_default_user()
+# 密钥：优先环境变量，其次 init-db 生成的密钥文件；都没有时返回 None
+def load_secret_key():
+    if os.environ.get('SECRET_KEY'):
+        return os.environ['SECRET_KEY']
+    if os.path.exists(SECRET_KEY_FILE):
+        with open(SECRET_KEY_FILE) as f:
+            return f.read().strip()
+    return None
+
+# 首次部署执行一次：建表、创建默认用户、生成密钥文件
+def init_app_data():
+    init_db()
+    if not os.environ.get('SECRET_KEY') and not os.path.exists(SECRET_KEY_FILE):
+        with open(SECRET_KEY_FILE, 'w') as f:
+            f.write(secrets.token_hex(32))
+        os.chmod(SECRET_KEY_FILE, 0o600)
+
+# 应用工厂：不访问数据库，只做配置和模板预编译
+def create_app():
+    app = Flask(__name__)
+    CORS(app)
+    
+    secret_key = load_secret_key()
+    if secret_key is None:
+        # 兜底：随机生成（配合 gunicorn preload_app，所有 worker 仍共用同一个）
+        secret_key = secrets.token_hex(32)
+        
+        # 等到真正处理请求时再提醒，避免 init-db 命令本身也打印这条警告
+        warned = False
+        
+        @app.before_request
+        def warn_missing_secret_key():
+            nonlocal warned
+            if not warned:
+                warned = True
+                print("警告：未设置 SECRET_KEY，请运行 flask --app app init-db 或在 .env 中设置")
+    
+    app.config['SECRET_KEY'] = secret_key
+    app.config['UPLOAD_FOLDER'] = 'static/uploads'
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
+    
+    # 确保上传文件夹存在
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'photos'), exist_ok=True)
+    
+    app.register_blueprint(bp)
+    
+    # 预编译模板；登录页没有动态内容，直接缓存渲染好的字节
+    with app.app_context():
+        app.jinja_env.get_template('index.html')
+        app.config['LOGIN_PAGE_BYTES'] = render_template('login.html').encode('utf-8')
+    
+    @app.cli.command('init-db')
+    def init_db_command():
+        """初始化数据库和默认用户（只需执行一次）"""
+        init_app_data()
+        print("数据库初始化完成")
+    
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=False, host='0.0.0.0', port=5001)
\ No newline at end of file
+    init_app_data()
+    create_app().run(debug=False, host='0.0.0.0', port=5001)
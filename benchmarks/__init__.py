@@ -0,0 +1 @@
+# benchmarks 性能测试
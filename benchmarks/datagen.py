@@ -0,0 +1,121 @@
+# datagen.py 合成测试数据：用户、地点（按 GEOGRAPHIC_RANGES 分布）、留言
+#
+# 用法：python -m benchmarks.datagen --users 5 --places 2000 --messages 5 --out /tmp/bench
+# 生成的数据库放在 --out 目录下的 database.db，不会碰到真实数据
+import argparse
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+# 与 static/js/main.js 中的 GEOGRAPHIC_RANGES 保持一致（不含 global / currentCity）
+GEOGRAPHIC_RANGES = {
+    'asia': {'minLat': -10, 'maxLat': 55, 'minLng': 60, 'maxLng': 150},
+    'northAmerica': {'minLat': 15, 'maxLat': 72, 'minLng': -168, 'maxLng': -52},
+    'usa': {'minLat': 24, 'maxLat': 49, 'minLng': -125, 'maxLng': -66},
+    'china': {'minLat': 18, 'maxLat': 54, 'minLng': 73, 'maxLng': 135},
+    'boston': {'minLat': 42.2, 'maxLat': 42.5, 'minLng': -71.2, 'maxLng': -70.9}
+}
+
+# 与 RESTAURANT_TYPES 的 key 保持一致
+CATEGORIES = ['chinese', 'western', 'japanese', 'korean', 'cafe', 'dessert',
+              'hotpot', 'bbq', 'tea', 'bar', 'fastfood', 'other']
+
+BENCH_PASSWORD = 'bench-password'
+
+
+def bench_username(index):
+    return f'bench{index:03d}'
+
+
+def random_place(rng, region=None):
+    bounds = GEOGRAPHIC_RANGES[region or rng.choice(list(GEOGRAPHIC_RANGES))]
+    place_type = rng.choice(['heart', 'paw'])
+    created_at = datetime(2024, 1, 1) + timedelta(seconds=rng.randint(0, 600 * 86400))
+    return {
+        'lat': round(rng.uniform(bounds['minLat'], bounds['maxLat']), 6),
+        'lng': round(rng.uniform(bounds['minLng'], bounds['maxLng']), 6),
+        'type': place_type,
+        'name': f'店铺{rng.randint(0, 10 ** 9)}',
+        'note': rng.choice(['', '好吃！', '下次再来', '排队太久了', '环境不错，适合约会']),
+        'rating': rng.randint(1, 5) if place_type == 'paw' else 0,
+        'category': rng.choice(CATEGORIES),
+        'created_at': created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'visited_at': created_at.strftime('%Y-%m-%d') if place_type == 'paw' else None
+    }
+
+
+def export_payload(places, user='bench'):
+    # 与 /api/export 的返回格式一致，可直接用于 /api/import
+    return {
+        'version': '1.1',
+        'exported_at': datetime.now().isoformat(),
+        'user': user,
+        'places': places
+    }
+
+
+# 在 db_path 中建表并写入 users 个用户，每人 places 个地点、每个地点 messages 条留言
+# 只建表结构，不创建 app 的默认用户
+def populate(db_path, users=5, places=1000, messages=3, seed=42):
+    import app as app_module
+
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    app_module.create_tables(c)
+    usernames = []
+    for i in range(users):
+        username = bench_username(i)
+        c.execute('''
+            INSERT OR IGNORE INTO users (username, password_hash, display_name)
+            VALUES (?, ?, ?)
+        ''', (username, password_hash, f'测试用户{i}'))
+        c.execute("SELECT id, display_name FROM users WHERE username = ?", (username,))
+        user_id, display_name = c.fetchone()
+        usernames.append(username)
+
+        for _ in range(places):
+            place = random_place(rng)
+            c.execute('''
+                INSERT INTO places (lat, lng, type, name, note, rating, category,
+                                    created_by, user_id, created_at, visited_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (place['lat'], place['lng'], place['type'], place['name'], place['note'],
+                  place['rating'], place['category'], display_name, user_id,
+                  place['created_at'], place['visited_at']))
+            place_id = c.lastrowid
+            c.executemany('''
+                INSERT INTO messages (place_id, author, content) VALUES (?, ?, ?)
+            ''', [(place_id, display_name, f'留言{j}') for j in range(messages)])
+
+    conn.commit()
+    conn.close()
+    return usernames
+
+
+# 在 workdir 中生成 database.db（app 使用相对路径 database.db）
+def build_dataset(workdir, users=5, places=1000, messages=3, seed=42):
+    os.makedirs(workdir, exist_ok=True)
+    return populate(os.path.join(workdir, 'database.db'), users, places, messages, seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成合成测试数据')
+    parser.add_argument('--out', required=True, help='输出目录（database.db 会写在这里）')
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--places', type=int, default=1000, help='每个用户的地点数')
+    parser.add_argument('--messages', type=int, default=3, help='每个地点的留言数')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    usernames = build_dataset(args.out, args.users, args.places, args.messages, args.seed)
+    print(f'已生成 {len(usernames)} 个用户（密码 {BENCH_PASSWORD}），每人 {args.places} 个地点')
+
+
+if __name__ == '__main__':
+    main()
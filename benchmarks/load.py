@@ -0,0 +1,202 @@
+# load.py 本地多客户端压测：启动 gunicorn，多个客户端进程并发请求
+#
+# 用法：python -m benchmarks.load --clients 8 --duration 30 --workers 4
+# 报告 login / list / add / update / import / export / stats 的 p50/p95/p99 与吞吐量，
+# 结果保存到 benchmarks/results/load-*.json
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from benchmarks import datagen
+from benchmarks.results import print_table, save_results, summarize
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 各操作的权重：读多写少，导入/导出/登录较少
+OPERATION_WEIGHTS = {
+    'list': 30,
+    'stats': 20,
+    'add': 15,
+    'update': 15,
+    'export': 8,
+    'import': 4,
+    'login': 8
+}
+IMPORT_BATCH = 20
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_server(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'gunicorn 在 {timeout} 秒内没有启动')
+
+
+class Client:
+    def __init__(self, port, username):
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        self.credentials = {'username': username, 'password': datagen.BENCH_PASSWORD}
+        self.cookie = None
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # gunicorn sync worker 不保持长连接，断开后重连一次
+            self.conn.close()
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+        data = response.read()
+        set_cookie = response.getheader('Set-Cookie')
+        if set_cookie:
+            self.cookie = set_cookie.split(';', 1)[0]
+        return response.status, data
+
+    def json(self, method, path, payload):
+        return self.request(method, path, json.dumps(payload).encode('utf-8'),
+                            {'Content-Type': 'application/json'})
+
+    def upload(self, path, filename, content):
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="backup_file"; filename="{filename}"\r\n'
+            f'Content-Type: application/json\r\n\r\n'
+        ).encode('utf-8') + content + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        return self.request('POST', path, body, {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+    def login(self):
+        return self.json('POST', '/api/login', self.credentials)
+
+
+# 单个客户端进程：登录后在 duration 秒内按权重随机执行操作
+def _client_worker(args):
+    port, username, duration, seed = args
+    rng = random.Random(seed)
+    client = Client(port, username)
+    status, _ = client.login()
+    if status != 200:
+        raise RuntimeError(f'{username} 登录失败: {status}')
+
+    operations = list(OPERATION_WEIGHTS)
+    weights = [OPERATION_WEIGHTS[op] for op in operations]
+    own_ids = []
+    samples = []
+    deadline = time.time() + duration
+
+    while time.time() < deadline:
+        op = rng.choices(operations, weights)[0]
+        if op == 'update' and not own_ids:
+            op = 'add'
+
+        t0 = time.perf_counter()
+        if op == 'list':
+            status, _ = client.request('GET', '/api/places')
+        elif op == 'stats':
+            status, _ = client.request('GET', '/api/stats')
+        elif op == 'add':
+            status, data = client.json('POST', '/api/places', datagen.random_place(rng))
+            if status == 200:
+                own_ids.append(json.loads(data)['id'])
+        elif op == 'update':
+            status, _ = client.json('PUT', f'/api/places/{rng.choice(own_ids)}',
+                                    {'type': 'paw', 'rating': rng.randint(1, 5)})
+        elif op == 'export':
+            status, _ = client.request('GET', '/api/export')
+        elif op == 'import':
+            payload = datagen.export_payload([datagen.random_place(rng) for _ in range(IMPORT_BATCH)])
+            status, _ = client.upload('/api/import', 'backup.json', json.dumps(payload).encode('utf-8'))
+        else:
+            status, _ = client.login()
+        samples.append((op, time.perf_counter() - t0, status == 200))
+
+    return samples
+
+
+# 在 workdir 上启动 gunicorn 并运行所有客户端，返回 (各客户端样本, 总耗时)
+def _drive(workdir, usernames, clients, duration, workers, seed):
+    port = _free_port()
+    env = dict(os.environ, SECRET_KEY=os.environ.get('SECRET_KEY', 'bench-secret'))
+    server = subprocess.Popen([
+        sys.executable, '-m', 'gunicorn',
+        '-c', os.path.join(REPO_DIR, 'gunicorn.conf.py'),
+        '--chdir', workdir, '--pythonpath', REPO_DIR,
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+        '--access-logfile', os.devnull
+    ], env=env)
+
+    try:
+        _wait_for_server(port)
+        jobs = [(port, usernames[i], duration, seed + i) for i in range(clients)]
+        started = time.perf_counter()
+        with multiprocessing.Pool(clients) as pool:
+            results = pool.map(_client_worker, jobs)
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    return results, elapsed
+
+
+def run(clients=8, duration=30, workers=4, places=1000, messages=3, seed=42):
+    with tempfile.TemporaryDirectory(prefix='map-load-') as workdir:
+        usernames = datagen.build_dataset(workdir, users=clients, places=places, messages=messages, seed=seed)
+        results, elapsed = _drive(workdir, usernames, clients, duration, workers, seed)
+
+    latencies = {op: [] for op in OPERATION_WEIGHTS}
+    errors = {op: 0 for op in OPERATION_WEIGHTS}
+    for samples in results:
+        for op, latency, ok in samples:
+            latencies[op].append(latency)
+            if not ok:
+                errors[op] += 1
+
+    routes = {op: summarize(values, elapsed, errors[op]) for op, values in latencies.items()}
+    routes['total'] = summarize([l for values in latencies.values() for l in values],
+                                elapsed, sum(errors.values()))
+    return routes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='gunicorn 多客户端压测')
+    parser.add_argument('--clients', type=int, default=8, help='并发客户端进程数')
+    parser.add_argument('--duration', type=float, default=30, help='压测时长（秒）')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker 数')
+    parser.add_argument('--places', type=int, default=1000, help='每个客户端用户的预置地点数')
+    parser.add_argument('--messages', type=int, default=3, help='每个地点的留言数')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', help='结果 JSON 路径（默认 benchmarks/results/load-*.json）')
+    args = parser.parse_args(argv)
+
+    routes = run(args.clients, args.duration, args.workers, args.places, args.messages, args.seed)
+    print_table(routes)
+    path = save_results('load', vars(args), routes, args.out)
+    print(f'结果已保存: {path}')
+
+
+if __name__ == '__main__':
+    main()
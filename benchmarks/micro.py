@@ -0,0 +1,114 @@
+# micro.py 进程内微基准：用 Flask test client 逐个路由计时
+#
+# 用法：python -m benchmarks.micro --places 2000 --iterations 200
+# 数据库建在临时目录中，结果保存到 benchmarks/results/micro-*.json
+import argparse
+import io
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks import datagen
+from benchmarks.results import print_table, save_results, summarize
+
+IMPORT_BATCH = 50
+
+
+def _timed(latencies, fn):
+    t0 = time.perf_counter()
+    response = fn()
+    latencies.append(time.perf_counter() - t0)
+    return response
+
+
+def run(places=1000, messages=3, iterations=100, seed=42):
+    import app as app_module
+
+    os.environ.setdefault('SECRET_KEY', 'bench-secret')
+    rng = random.Random(seed)
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory(prefix='map-bench-') as workdir:
+        try:
+            username = datagen.build_dataset(workdir, users=1, places=places, messages=messages, seed=seed)[0]
+            os.chdir(workdir)
+            latencies, errors = _run_routes(app_module, username, iterations, rng)
+        finally:
+            os.chdir(cwd)
+
+    return {name: summarize(values, errors=errors.get(name, 0)) for name, values in latencies.items()}
+
+
+def _run_routes(app_module, username, iterations, rng):
+    # 逐个路由计时；调用方负责把工作目录切到基准数据库所在目录
+    client = app_module.create_app().test_client()
+    credentials = {'username': username, 'password': datagen.BENCH_PASSWORD}
+    latencies = {}
+    errors = {}
+
+    def bench(name, fn, expected=200):
+        samples = latencies.setdefault(name, [])
+        response = _timed(samples, fn)
+        if response.status_code != expected:
+            errors[name] = errors.get(name, 0) + 1
+        return response
+
+    for _ in range(iterations):
+        bench('login_page', lambda: client.get('/login'))
+    client.post('/api/login', json=credentials)
+
+    for _ in range(iterations):
+        bench('login', lambda: client.post('/api/login', json=credentials))
+        bench('index', lambda: client.get('/'))
+        bench('user', lambda: client.get('/api/user'))
+        bench('list', lambda: client.get('/api/places'))
+        bench('stats', lambda: client.get('/api/stats'))
+
+        place = datagen.random_place(rng)
+        place_id = bench('add', lambda: client.post('/api/places', json=place)).get_json()['id']
+        bench('update', lambda: client.put(f'/api/places/{place_id}',
+                                           json={'type': 'paw', 'rating': 5, 'note': '更新'}))
+        bench('add_message', lambda: client.post(f'/api/places/{place_id}/messages',
+                                                 json={'content': '测试留言'}))
+        bench('messages', lambda: client.get(f'/api/places/{place_id}/messages'))
+        bench('delete', lambda: client.delete(f'/api/places/{place_id}'))
+
+        bench('export', lambda: client.get('/api/export'))
+
+    # 导入单独放在最后，并在每次导入后删掉导入的地点，
+    # 保证读路由和每次导入面对的都是 --places 指定的数据量
+    conn = sqlite3.connect('database.db')
+    last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM places').fetchone()[0]
+    for _ in range(iterations):
+        payload = json.dumps(datagen.export_payload(
+            [datagen.random_place(rng) for _ in range(IMPORT_BATCH)])).encode('utf-8')
+        bench('import', lambda: client.post('/api/import', content_type='multipart/form-data', data={
+            'backup_file': (io.BytesIO(payload), 'backup.json')
+        }))
+        conn.execute('DELETE FROM places WHERE id > ?', (last_id,))
+        conn.commit()
+    conn.close()
+
+    return latencies, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='进程内逐路由微基准（Flask test client）')
+    parser.add_argument('--places', type=int, default=1000, help='预置地点数')
+    parser.add_argument('--messages', type=int, default=3, help='每个地点的留言数')
+    parser.add_argument('--iterations', type=int, default=100, help='每个路由的请求次数')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', help='结果 JSON 路径（默认 benchmarks/results/micro-*.json）')
+    args = parser.parse_args(argv)
+
+    routes = run(args.places, args.messages, args.iterations, args.seed)
+    print_table(routes)
+    path = save_results('micro', vars(args), routes, args.out)
+    print(f'结果已保存: {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# results.py 统计与结果保存：分位数、吞吐量、JSON 落盘与两次结果对比
+#
+# 对比用法：python -m benchmarks.results old.json new.json
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def percentile(sorted_values, p):
+    # 线性插值分位数，sorted_values 须已排序
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+# latencies 单位为秒；elapsed 为该路由所在阶段的总耗时（用于计算吞吐量）
+def summarize(latencies, elapsed=None, errors=0):
+    values = sorted(latencies)
+    total = sum(values)
+    summary = {
+        'count': len(values),
+        'errors': errors,
+        'mean_ms': round(total / len(values) * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0
+    }
+    if elapsed is None:
+        elapsed = total
+    summary['throughput_rps'] = round(len(values) / elapsed, 1) if elapsed > 0 else 0.0
+    return summary
+
+
+def save_results(kind, params, routes, out=None):
+    # 输出路径不影响结果，不记入参数（否则换个 --out 就无法对比）
+    params = {key: value for key, value in params.items() if key != 'out'}
+    data = {
+        'kind': kind,
+        'created_at': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'params': params,
+        'routes': routes
+    }
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{kind}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out, 'w') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return out
+
+
+def print_table(routes):
+    print(f"{'route':<12}{'count':>8}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, s in routes.items():
+        print(f"{name:<12}{s['count']:>8}{s['errors']:>6}{s['p50_ms']:>10.2f}"
+              f"{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['throughput_rps']:>10.1f}")
+
+
+# 对比两次结果；p95 变慢超过 threshold（百分比）的路由视为回归
+def compare(old_path, new_path, threshold=10.0):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    # 不同类型（micro / load）或不同参数的结果没有可比性
+    if old['kind'] != new['kind']:
+        raise ValueError(f"结果类型不同，无法对比: {old['kind']} vs {new['kind']}")
+    if old['params'] != new['params']:
+        raise ValueError(f"测试参数不同，无法对比: {old['params']} vs {new['params']}")
+
+    regressions = []
+    print(f"{'route':<10}{'old p95':>10}{'new p95':>10}{'change':>10}")
+    for name, new_stats in new['routes'].items():
+        old_stats = old['routes'].get(name)
+        if not old_stats or not old_stats['p95_ms']:
+            continue
+        change = (new_stats['p95_ms'] - old_stats['p95_ms']) / old_stats['p95_ms'] * 100
+        flag = '  <-- 回归' if change > threshold else ''
+        print(f"{name:<10}{old_stats['p95_ms']:>10.2f}{new_stats['p95_ms']:>10.2f}{change:>9.1f}%{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='对比两次基准测试结果')
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=10.0, help='p95 变慢超过该百分比视为回归')
+    args = parser.parse_args(argv)
+    try:
+        regressions = compare(args.old, args.new, args.threshold)
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
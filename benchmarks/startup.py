@@ -0,0 +1,53 @@
+# startup.py 启动耗时测试：从 import app 到第一个请求返回的时间
+#
+# 用法：python -m benchmarks.startup --runs 10
+# 每次在独立子进程中测量，避免模块缓存影响结果
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = '''
+import time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+flask_app = app_module.create_app()
+t2 = time.perf_counter()
+response = flask_app.test_client().get('/login')
+t3 = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(f"{t1 - t0} {t2 - t1} {t3 - t2} {t3 - t0}")
+'''
+
+
+def measure(runs):
+    samples = {'import': [], 'create_app': [], 'first_request': [], 'total': []}
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        for key, value in zip(samples, output.split()):
+            samples[key].append(float(value) * 1000)
+
+    return {
+        key: {
+            'min_ms': round(min(values), 2),
+            'median_ms': round(statistics.median(values), 2),
+            'max_ms': round(max(values), 2)
+        }
+        for key, values in samples.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='测量 import 到首个请求的启动耗时')
+    parser.add_argument('--runs', type=int, default=10, help='测量次数')
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.runs), indent=2))
+
+
+if __name__ == '__main__':
+    main()
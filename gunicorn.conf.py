@@ -0,0 +1,16 @@
+# gunicorn.conf.py 生产环境启动配置
+# 用法：先执行一次 flask --app app init-db，然后 gunicorn
+import os
+
+# 通过应用工厂创建 app
+wsgi_app = 'app:create_app()'
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5001')
+# 所有 worker 写同一个 SQLite 文件，worker 太多容易出现 database is locked，默认保持少量
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+
+# 在 master 进程里导入并创建 app（模板、登录页缓存、密钥），worker fork 后直接复用
+preload_app = True
+
+timeout = 30
+accesslog = '-'
@@ -0,0 +1,239 @@
+# maintenance.py 数据库维护工具：热备份 / VACUUM / ANALYZE / 空间报告
+#
+# 用法：
+#   python maintenance.py backup              # 生成一份一致性快照并轮换旧快照
+#   python maintenance.py optimize            # incremental_vacuum + ANALYZE + PRAGMA optimize
+#   python maintenance.py report              # 打印数据库大小、页数、碎片率
+#   python maintenance.py check               # 自检：确认 optimize 能回收删除数据留下的空闲页
+#   python maintenance.py schedule --interval 86400   # 常驻，按间隔执行备份 + 优化
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+DB_PATH = 'database.db'
+BACKUP_DIR = 'backups'
+SNAPSHOT_PREFIX = 'database-'
+SNAPSHOT_SUFFIX = '.db'
+
+# 每一步复制的页数；步与步之间会释放读锁，写操作不会被整个备份过程阻塞
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_SLEEP_SECONDS = 0.05
+
+# 每次 incremental_vacuum 最多回收的空闲页数（0 表示全部回收）
+VACUUM_PAGES = 0
+
+# 默认保留的快照数量
+KEEP_SNAPSHOTS = 7
+
+
+def _connect(db_path):
+    # sqlite3.connect 会自动创建不存在的文件，路径写错时宁可报错也不要生成空库
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f'数据库不存在: {db_path}')
+    # 与 app.py 保持一致，使用普通连接；timeout 避免与写操作竞争时立即报 locked
+    return sqlite3.connect(db_path, timeout=30)
+
+
+# 热备份：使用 sqlite3 backup API 分步复制，先写临时文件再原子改名
+def backup_snapshot(db_path=DB_PATH, backup_dir=BACKUP_DIR,
+                    pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_SLEEP_SECONDS):
+    src = _connect(db_path)
+
+    os.makedirs(backup_dir, exist_ok=True)
+    # 文件名精确到微秒，同一秒内的多次备份不会互相覆盖
+    name = f"{SNAPSHOT_PREFIX}{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{SNAPSHOT_SUFFIX}"
+    target = os.path.join(backup_dir, name)
+    tmp_target = target + '.tmp'
+    if os.path.exists(target) or os.path.exists(tmp_target):
+        src.close()
+        raise FileExistsError(f'快照已存在: {target}')
+
+    dst = sqlite3.connect(tmp_target)
+    try:
+        # 备份过程中若源库被其他连接修改，backup API 会自动从头重新复制，保证快照一致
+        src.backup(dst, pages=pages, sleep=sleep)
+        ok = dst.execute('PRAGMA integrity_check').fetchone()[0]
+        if ok != 'ok':
+            raise sqlite3.DatabaseError(f'快照校验失败: {ok}')
+    except Exception:
+        dst.close()
+        src.close()
+        if os.path.exists(tmp_target):
+            os.remove(tmp_target)
+        raise
+
+    dst.close()
+    src.close()
+    os.replace(tmp_target, target)
+    return target
+
+
+# 快照轮换：按文件名（时间戳）排序，只保留最新的 keep 份
+def rotate_snapshots(backup_dir=BACKUP_DIR, keep=KEEP_SNAPSHOTS):
+    pattern = os.path.join(backup_dir, f'{SNAPSHOT_PREFIX}*{SNAPSHOT_SUFFIX}')
+    snapshots = sorted(glob.glob(pattern))
+    removed = []
+    if keep > 0 and len(snapshots) > keep:
+        for path in snapshots[:-keep]:
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+
+# 开启增量 VACUUM（只需执行一次；需要一次完整 VACUUM 才能切换模式）
+def ensure_incremental_vacuum(conn):
+    mode = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+    if mode != 2:
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+        return True
+    return False
+
+
+# 日常优化：回收空闲页、更新统计信息、让查询规划器自行优化
+def optimize(db_path=DB_PATH, vacuum_pages=VACUUM_PAGES):
+    conn = _connect(db_path)
+    try:
+        freelist_before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        switched = ensure_incremental_vacuum(conn)
+
+        # execute() 只会让 PRAGMA 单步执行一次（每步只回收一页），executescript 才会执行到底
+        if vacuum_pages > 0:
+            conn.executescript(f'PRAGMA incremental_vacuum({int(vacuum_pages)});')
+        else:
+            conn.executescript('PRAGMA incremental_vacuum;')
+        conn.execute('ANALYZE')
+        conn.execute('PRAGMA optimize')
+        conn.commit()
+
+        freelist_after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    finally:
+        conn.close()
+
+    return {
+        'switched_to_incremental': switched,
+        'freed_pages': freelist_before - freelist_after,
+        'freelist_count': freelist_after
+    }
+
+
+# 空间报告：文件大小、页数、空闲页与碎片率
+def db_report(db_path=DB_PATH):
+    conn = _connect(db_path)
+    try:
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        freelist_count = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+        journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+    finally:
+        conn.close()
+
+    wal_path = db_path + '-wal'
+    return {
+        'path': os.path.abspath(db_path),
+        'file_size': os.path.getsize(db_path),
+        'wal_size': os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+        'page_size': page_size,
+        'page_count': page_count,
+        'freelist_count': freelist_count,
+        'free_bytes': freelist_count * page_size,
+        'fragmentation': round(freelist_count / page_count * 100, 2) if page_count > 0 else 0,
+        'auto_vacuum': {0: 'none', 1: 'full', 2: 'incremental'}.get(auto_vacuum, auto_vacuum),
+        'journal_mode': journal_mode
+    }
+
+
+# 自检：在临时数据库里删除数据后运行 optimize，确认空闲页确实被回收
+def self_check(rows=2000, vacuum_pages=50):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'check.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('CREATE TABLE t (x TEXT)')
+        conn.executemany('INSERT INTO t VALUES (?)', [('x' * 500,)] * rows)
+        conn.commit()
+        conn.execute('DELETE FROM t')
+        conn.commit()
+        conn.close()
+
+        freelist = db_report(db_path)['freelist_count']
+        if freelist <= vacuum_pages:
+            raise RuntimeError(f'测试数据不足，空闲页只有 {freelist}')
+
+        result = optimize(db_path, vacuum_pages)
+        if result['freed_pages'] < vacuum_pages:
+            raise RuntimeError(f'限量回收失败: {result}')
+
+        result = optimize(db_path)
+        if result['freelist_count'] != 0:
+            raise RuntimeError(f'空闲页未全部回收: {result}')
+
+    return True
+
+
+# 常驻调度：每隔 interval 秒做一次备份 + 轮换 + 优化
+def run_schedule(db_path=DB_PATH, backup_dir=BACKUP_DIR, interval=86400,
+                 keep=KEEP_SNAPSHOTS, vacuum_pages=VACUUM_PAGES):
+    while True:
+        started = time.time()
+        try:
+            snapshot = backup_snapshot(db_path, backup_dir)
+            removed = rotate_snapshots(backup_dir, keep)
+            result = optimize(db_path, vacuum_pages)
+            print(f"[{datetime.now().isoformat()}] 快照: {snapshot}，"
+                  f"清理旧快照 {len(removed)} 份，回收空闲页 {result['freed_pages']}")
+        except Exception as e:
+            print(f"[{datetime.now().isoformat()}] 维护失败: {e}")
+
+        time.sleep(max(0, interval - (time.time() - started)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='数据库维护：热备份、VACUUM/ANALYZE 与空间报告')
+    parser.add_argument('--db', default=DB_PATH, help='数据库文件路径')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_backup = sub.add_parser('backup', help='生成一致性快照并轮换旧快照')
+    p_backup.add_argument('--dir', default=BACKUP_DIR, help='快照目录')
+    p_backup.add_argument('--keep', type=int, default=KEEP_SNAPSHOTS, help='保留的快照数量（0 表示不清理）')
+
+    p_optimize = sub.add_parser('optimize', help='incremental_vacuum + ANALYZE + PRAGMA optimize')
+    p_optimize.add_argument('--pages', type=int, default=VACUUM_PAGES, help='最多回收的空闲页数（0 表示全部）')
+
+    sub.add_parser('report', help='打印数据库大小、页数与碎片率（JSON）')
+
+    sub.add_parser('check', help='在临时数据库上自检 optimize 能否回收空闲页')
+
+    p_schedule = sub.add_parser('schedule', help='常驻运行，定时备份与优化')
+    p_schedule.add_argument('--dir', default=BACKUP_DIR, help='快照目录')
+    p_schedule.add_argument('--keep', type=int, default=KEEP_SNAPSHOTS, help='保留的快照数量')
+    p_schedule.add_argument('--interval', type=int, default=86400, help='执行间隔（秒）')
+    p_schedule.add_argument('--pages', type=int, default=VACUUM_PAGES, help='每次最多回收的空闲页数')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'backup':
+        snapshot = backup_snapshot(args.db, args.dir)
+        removed = rotate_snapshots(args.dir, args.keep)
+        print(f'快照已保存: {snapshot}')
+        for path in removed:
+            print(f'已删除旧快照: {path}')
+    elif args.command == 'optimize':
+        print(json.dumps(optimize(args.db, args.pages), ensure_ascii=False, indent=2))
+    elif args.command == 'report':
+        print(json.dumps(db_report(args.db), ensure_ascii=False, indent=2))
+    elif args.command == 'check':
+        self_check()
+        print('自检通过：optimize 已回收全部空闲页')
+    elif args.command == 'schedule':
+        run_schedule(args.db, args.dir, args.interval, args.keep, args.pages)
+
+
+if __name__ == '__main__':
+    main()
@@ -390,18 +390,15 @@ async function saveNewPlace(lat, lng, type) {
     };
     
     try {
-        // 发送到后端
-        const response = await fetch(`${API_URL}/api/places`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify(placeData)
+        // 发送到后端（离线时先放进队列，用临时 id 显示）
+        const tempPlaceId = nextTempPlaceId--;
+        const { response, queued } = await sendOrQueue({
+            op: 'add',
+            placeId: tempPlaceId,
+            data: placeData
         });
         
-        if (response.ok) {
-            const result = await response.json();
-            
+        if (queued || response.ok) {
             // 移除临时标记
             if (window.tempMarker) {
                 map.removeLayer(window.tempMarker);
@@ -409,13 +406,14 @@ async function saveNewPlace(lat, lng, type) {
             }
             
             // 添加正式标记
-            placeData.id = result.id;
+            placeData.id = queued ? tempPlaceId : (await response.json()).id;
             placeData.created_at = new Date().toISOString();
             allPlaces.push(placeData);
             addMarkerToMap(placeData);
+            PlaceStore.putPlace(placeData);
             
             // 显示成功提示
-            showNotification('✅ 地点已保存！', 'success');
+            showNotification(queued ? '📴 已离线保存，联网后自动同步' : '✅ 地点已保存！', 'success');
             
             // 创建彩纸特效
             createConfetti();
@@ -465,76 +463,304 @@ function cancelNewPlace() {
 }
 
 // ========================================
-// 加载所有地点
+// 加载所有地点：先用本地数据渲染，再在后台与服务器同步
 // ========================================
+let localPlacesRendered = false;     // 是否已用 IndexedDB 数据完成首屏渲染
+let syncInProgress = null;           // 正在进行的同步（避免并发）
+let resyncRequested = false;         // 同步期间又被请求同步时，结束后再同步一轮
+let localWriteCount = 0;             // 本地写操作计数，用来判断拉取到的服务器数据是否已过时
+
 async function loadPlaces() {
     try {
-        showLoading(true);
-        console.log('开始加载地点...');
+        if (!localPlacesRendered) {
+            localPlacesRendered = true;
+            // 用户名由服务器渲染进页面（/ 需要登录），不用等网络请求就能打开本地数据
+            PlaceStore.useUser(window.CURRENT_USERNAME);
+            
+            const cachedPlaces = await PlaceStore.getAllPlaces();
+            console.log('本地缓存地点数量:', cachedPlaces.length);
+            if (cachedPlaces.length) {
+                renderAllPlaces(cachedPlaces);
+            } else {
+                showLoading(true);
+            }
+        }
         
-        const response = await fetch(`${API_URL}/api/places`);
-        console.log('加载地点响应状态:', response.status);
+        await syncPlaces();
+    } finally {
+        showLoading(false);
+    }
+}
+
+// 用给定数据重建所有标记（只在首屏使用）
+function renderAllPlaces(places) {
+    Object.values(markers).forEach(marker => {
+        map.removeLayer(marker);
+    });
+    markers = {};
+    allPlaces = places;
+    
+    places.forEach(place => {
+        try {
+            addMarkerToMap(place);
+        } catch (err) {
+            console.error('添加标记失败:', place, err);
+        }
+    });
+    
+    updateStats();
+    updateTimeline();
+}
+
+// 后台同步：先提交离线队列，再拉取服务器数据并只更新有变化的地点
+// 已有同步在进行时不并发，而是在它结束后再同步一轮（例如导入后需要拿到最新数据）
+function syncPlaces() {
+    if (syncInProgress) {
+        resyncRequested = true;
+        return syncInProgress;
+    }
+    
+    syncInProgress = (async () => {
+        try {
+            do {
+                resyncRequested = false;
+                await syncOnce();
+            } while (resyncRequested);
+        } finally {
+            syncInProgress = null;
+        }
+    })();
+    return syncInProgress;
+}
+
+async function syncOnce() {
+    try {
+        const flushed = await flushOutbox();
+        if (!flushed) return;
         
+        const writesBefore = localWriteCount;
+        const response = await fetch(`${API_URL}/api/places`);
         if (response.ok) {
-            const places = await response.json();
-            console.log('加载到的地点:', places);
-            allPlaces = places;
-            
-            // 清除现有标记
-            console.log('清除现有标记，数量:', Object.keys(markers).length);
-            Object.values(markers).forEach(marker => {
-                map.removeLayer(marker);
-            });
-            markers = {};
-            
-            // 添加所有标记到地图
-            console.log('准备添加标记到地图，数量:', places.length);
-            places.forEach((place, index) => {
-                console.log(`添加第 ${index + 1} 个标记:`, place);
-                try {
-                    addMarkerToMap(place);
-                    console.log(`标记 ${index + 1} 添加成功`);
-                } catch (err) {
-                    console.error(`添加标记 ${index + 1} 失败:`, err);
-                }
-            });
-            
-            console.log('所有标记添加完成，markers对象:', markers);
-            
-            // 更新统计和时间轴
-            updateStats();
-            updateTimeline();
-            
+            const serverPlaces = await response.json();
+            // 拉取期间有本地写操作（直接发送或排队），这份数据已过时，再同步一轮
+            const outbox = await PlaceStore.getOutbox();
+            if (localWriteCount !== writesBefore || outbox.some(e => e.op !== 'add')) {
+                resyncRequested = true;
+                return;
+            }
+            const pendingAddIds = new Set(outbox.filter(e => e.op === 'add').map(e => e.placeId));
+            reconcilePlaces(serverPlaces, pendingAddIds);
+        } else if (response.status === 401) {
+            window.location.href = '/login';
         } else {
             console.error('加载失败，状态码:', response.status);
-            const errorText = await response.text();
-            console.error('错误信息:', errorText);
         }
     } catch (error) {
-        console.error('加载地点失败:', error);
-        console.log('尝试从本地存储加载...');
-        loadFromLocalStorage();
-    } finally {
-        showLoading(false);
-        console.log('加载完成');
+        console.log('同步失败，继续使用本地数据:', error);
+    }
+}
+
+// 参与比较的字段；任一字段不同即视为该地点有更新
+const PLACE_SYNC_FIELDS = ['lat', 'lng', 'type', 'name', 'note', 'rating', 'category',
+                           'photo_url', 'created_at', 'visited_at'];
+
+function samePlace(a, b) {
+    return PLACE_SYNC_FIELDS.every(field => (a[field] ?? null) === (b[field] ?? null));
+}
+
+// 对比服务器数据与本地数据，增量更新 IndexedDB 和地图标记
+// 负数 id 的离线地点只有在队列里还有对应 add 时才保留
+function reconcilePlaces(serverPlaces, pendingAddIds) {
+    const localById = new Map(allPlaces.map(p => [p.id, p]));
+    const serverIds = new Set(serverPlaces.map(p => p.id));
+    
+    const changed = serverPlaces.filter(p => {
+        const local = localById.get(p.id);
+        return !local || !samePlace(local, p);
+    });
+    const pendingPlaces = allPlaces.filter(p => p.id < 0 && pendingAddIds.has(p.id));
+    const removedIds = allPlaces
+        .filter(p => !serverIds.has(p.id) && !pendingAddIds.has(p.id))
+        .map(p => p.id);
+    
+    if (!changed.length && !removedIds.length) return;
+    console.log(`同步：更新 ${changed.length} 个，删除 ${removedIds.length} 个`);
+    
+    allPlaces = serverPlaces.concat(pendingPlaces);
+    
+    changed.forEach(place => refreshMarker(place));
+    removedIds.forEach(placeId => {
+        if (markers[placeId]) {
+            map.removeLayer(markers[placeId]);
+            delete markers[placeId];
+        }
+    });
+    
+    PlaceStore.putPlaces(changed);
+    PlaceStore.deletePlaces(removedIds);
+    
+    updateStats();
+    updateTimeline();
+}
+
+// 重新创建单个地点的标记（类型或内容变化后）
+function refreshMarker(place) {
+    if (markers[place.id]) {
+        map.removeLayer(markers[place.id]);
+        delete markers[place.id];
     }
+    addMarkerToMap(place);
 }
 
 // ========================================
-// 从本地存储加载（备用）
+// 离线写操作队列
 // ========================================
-function loadFromLocalStorage() {
-    const savedPlaces = localStorage.getItem('mapPlaces');
-    if (savedPlaces) {
-        allPlaces = JSON.parse(savedPlaces);
-        allPlaces.forEach(place => {
-            addMarkerToMap(place);
+let nextTempPlaceId = -Date.now();   // 离线新建地点的临时 id（负数，不会和服务器 id 冲突）
+
+function isNetworkError(error) {
+    return error instanceof TypeError || !navigator.onLine;
+}
+
+// 写操作先发服务器，网络不通时放进队列，返回 { response } 或 { queued: true }
+// 队列里还有未提交的操作时也排队，保证按顺序提交；临时 id 的地点只能排在它的 add 之后
+async function sendOrQueue(entry) {
+    localWriteCount++;
+    const pending = await PlaceStore.getOutbox();
+    const canSend = !pending.length && (entry.op === 'add' || entry.placeId > 0);
+    
+    if (navigator.onLine && canSend) {
+        try {
+            return { response: await sendOutboxEntry(entry, entry.placeId) };
+        } catch (error) {
+            if (!isNetworkError(error)) throw error;
+        }
+    }
+    await PlaceStore.enqueue(entry);
+    if (navigator.onLine) {
+        syncPlaces();
+    }
+    return { queued: true };
+}
+
+// placeId 由调用方解析（临时 id 已换成服务器 id）
+function sendOutboxEntry(entry, placeId) {
+    if (entry.op === 'add') {
+        return fetch(`${API_URL}/api/places`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(entry.data)
         });
-        updateStats();
-        updateTimeline();
     }
+    if (entry.op === 'update') {
+        return fetch(`${API_URL}/api/places/${placeId}`, {
+            method: 'PUT',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(entry.data)
+        });
+    }
+    return fetch(`${API_URL}/api/places/${placeId}`, { method: 'DELETE' });
 }
 
+// 按顺序提交离线队列（提交期间新加入的操作也一并提交）
+// 全部处理完返回 true；网络中断或服务器暂时出错（5xx / 429）时保留队列、返回 false
+async function flushOutbox() {
+    let syncedCount = 0;
+    let rejectedCount = 0;
+    let entries;
+    
+    try {
+        while ((entries = await PlaceStore.getOutbox()).length) {
+            console.log('提交离线队列:', entries.length);
+            const idMap = await PlaceStore.getIdMap();
+            
+            for (const entry of entries) {
+                const placeId = entry.placeId < 0 ? (idMap[entry.placeId] ?? entry.placeId) : entry.placeId;
+                
+                // 临时 id 解析不到：对应的 add 已被服务器拒绝，后续操作一并丢弃
+                if (entry.op !== 'add' && placeId < 0) {
+                    await PlaceStore.removeOutboxEntry(entry);
+                    continue;
+                }
+                
+                let response;
+                try {
+                    response = await sendOutboxEntry(entry, placeId);
+                } catch (error) {
+                    console.log('网络不可用，稍后再提交离线队列');
+                    return false;
+                }
+                
+                if (response.status === 401) {
+                    window.location.href = '/login';
+                    return false;
+                }
+                if (response.status === 429 || response.status >= 500) {
+                    console.log('服务器暂时不可用，稍后再提交离线队列:', response.status);
+                    return false;
+                }
+                
+                if (response.ok) {
+                    if (entry.op === 'add') {
+                        const result = await response.json();
+                        idMap[entry.placeId] = result.id;
+                        await assignServerId(entry.placeId, result.id);
+                    }
+                    syncedCount++;
+                } else {
+                    // 明确的 4xx：服务器拒绝了这次修改，重试也不会成功
+                    console.error('离线操作被服务器拒绝，已丢弃:', entry, response.status);
+                    rejectedCount++;
+                    if (entry.op === 'add') {
+                        discardPendingPlace(entry.placeId);
+                    }
+                }
+                
+                await PlaceStore.removeOutboxEntry(entry);
+            }
+        }
+        
+        await PlaceStore.clearIdMap();
+        return true;
+    } finally {
+        if (rejectedCount) {
+            showNotification(`⚠️ 有 ${rejectedCount} 条离线修改被服务器拒绝，已放弃`, 'error');
+        } else if (syncedCount) {
+            showNotification('✅ 离线修改已同步', 'success');
+        }
+    }
+}
+
+// 离线地点提交成功后，把临时 id 换成服务器 id
+async function assignServerId(tempId, serverId) {
+    const place = allPlaces.find(p => p.id === tempId);
+    if (place) {
+        place.id = serverId;
+        if (markers[tempId]) {
+            map.removeLayer(markers[tempId]);
+            delete markers[tempId];
+        }
+        addMarkerToMap(place);
+    }
+    await PlaceStore.replacePlaceId(tempId, serverId, place);
+}
+
+// 离线地点被服务器拒绝：从地图、统计和本地存储中移除
+function discardPendingPlace(tempId) {
+    if (markers[tempId]) {
+        map.removeLayer(markers[tempId]);
+        delete markers[tempId];
+    }
+    allPlaces = allPlaces.filter(p => p.id !== tempId);
+    PlaceStore.deletePlace(tempId);
+    updateStats();
+    updateTimeline();
+}
+
+// 网络恢复后自动提交
+window.addEventListener('online', () => {
+    syncPlaces();
+});
+
 // ========================================
 // 添加标记到地图
 // ========================================
@@ -676,15 +902,9 @@ async function confirmConvert(placeId) {
                 `打卡感受: ${visitNote}`;
         }
         
-        const response = await fetch(`${API_URL}/api/places/${placeId}`, {
-            method: 'PUT',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify(updateData)
-        });
+        const { response, queued } = await sendOrQueue({ op: 'update', placeId, data: updateData });
         
-        if (response.ok) {
+        if (queued || response.ok) {
             // 关闭弹窗
             if (window.currentConvertModal) {
                 window.currentConvertModal.remove();
@@ -700,10 +920,11 @@ async function confirmConvert(placeId) {
             // 更新本地数据
             place.type = 'paw';
             place.rating = rating;
-            place.visited_at = new Date().toISOString();
+            place.visited_at = updateData.visited_at;
             if (visitNote) {
                 place.note = updateData.note;
             }
+            PlaceStore.putPlace(place);
             
             // 创建新的去过标记（脚印图标）
             const newMarker = L.marker([place.lat, place.lng], {
@@ -722,7 +943,7 @@ async function confirmConvert(placeId) {
             showAchievement('哟西！', `成功打卡 ${place.name}`, '/static/images/celebration-icon.png');
             createConfetti();
             playClickSound();
-            showNotification('✅ 恭喜完成打卡！', 'success');
+            showNotification(queued ? '📴 已离线打卡，联网后自动同步' : '✅ 恭喜完成打卡！', 'success');
         } else {
             const error = await response.json();
             showNotification(error.error || '转换失败', 'error');
@@ -831,24 +1052,17 @@ async function editPlace(placeId) {
     const newName = prompt('修改地点名称:', place.name);
     if (newName && newName !== place.name) {
         try {
-            const response = await fetch(`${API_URL}/api/places/${placeId}`, {
-                method: 'PUT',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({ name: newName })
-            });
+            const { response, queued } = await sendOrQueue({ op: 'update', placeId, data: { name: newName } });
             
-            if (response.ok) {
+            if (queued || response.ok) {
                 place.name = newName;
-                showNotification('✅ 已更新', 'success');
-                loadPlaces();
+                PlaceStore.putPlace(place);
+                refreshMarker(place);
+                showNotification(queued ? '📴 已离线修改，联网后自动同步' : '✅ 已更新', 'success');
             }
         } catch (error) {
             console.error('更新失败:', error);
-            place.name = newName;
-            saveToLocalStorage();
-            loadPlaces();
+            showNotification('更新失败，请重试', 'error');
         }
     }
 }
@@ -860,17 +1074,15 @@ async function deletePlace(placeId) {
     if (!confirm('确定要删除这个地点吗？')) return;
     
     try {
-        const response = await fetch(`${API_URL}/api/places/${placeId}`, {
-            method: 'DELETE'
-        });
+        // 离线时先本地删除，联网后再提交
+        const { response, queued } = await sendOrQueue({ op: 'delete', placeId });
         
-        if (response.ok) {
+        if (queued || response.ok) {
             removeMarkerAndPlace(placeId);
         }
     } catch (error) {
         console.error('删除失败:', error);
-        // 本地删除
-        removeMarkerAndPlace(placeId);
+        showNotification('删除失败，请重试', 'error');
     }
 }
 
@@ -888,7 +1100,7 @@ function removeMarkerAndPlace(placeId) {
     allPlaces = allPlaces.filter(p => p.id !== placeId);
     
     // 更新本地存储
-    saveToLocalStorage();
+    PlaceStore.deletePlace(placeId);
     
     showNotification('✅ 已删除', 'success');
     updateStats();
@@ -901,13 +1113,6 @@ function removeMarkerAndPlace(placeId) {
     }
 }
 
-// ========================================
-// 保存到本地存储
-// ========================================
-function saveToLocalStorage() {
-    localStorage.setItem('mapPlaces', JSON.stringify(allPlaces));
-}
-
 
 
 // ========================================
@@ -0,0 +1,207 @@
+// ========================================
+// 本地数据层：IndexedDB 存储地点 + 离线写操作队列
+// ========================================
+// 每个账号一个数据库（love-map-<用户名>），换账号登录不会看到或提交别人的数据
+// places 仓库：每个地点一条记录（keyPath: id），增删改只写对应记录
+// outbox 仓库：离线时的写操作（add / update / delete），联网后按顺序提交
+// idmap 仓库：离线新建地点的临时 id（负数）→ 服务器 id，提交队列时据此解析 placeId
+
+const PlaceStore = (() => {
+    const DB_PREFIX = 'love-map-';
+    const DB_VERSION = 1;
+    const PLACES = 'places';
+    const OUTBOX = 'outbox';
+    const IDMAP = 'idmap';
+    const LEGACY_KEY = 'mapPlaces';   // 旧版 localStorage 缓存
+
+    let dbName = null;
+    let dbPromise = null;
+    let memoryOutbox = [];            // IndexedDB 不可用时的兜底队列（仅当前页面有效）
+    let memoryOutboxSeq = 0;
+    let memoryIdMap = {};
+
+    // 切换到指定账号的数据库；username 为空时只使用内存兜底
+    function useUser(username) {
+        const name = username ? DB_PREFIX + username : null;
+        if (name !== dbName) {
+            if (dbPromise) {
+                dbPromise.then(db => db.close()).catch(() => {});
+            }
+            // 换账号时丢弃上一个账号的内存兜底数据（首次设置账号时保留）
+            if (dbName) {
+                memoryOutbox = [];
+                memoryIdMap = {};
+            }
+            dbName = name;
+            dbPromise = null;
+        }
+    }
+
+    function open() {
+        if (!dbPromise) {
+            dbPromise = new Promise((resolve, reject) => {
+                if (!window.indexedDB || !dbName) {
+                    reject(new Error('IndexedDB 不可用'));
+                    return;
+                }
+                const request = indexedDB.open(dbName, DB_VERSION);
+                request.onupgradeneeded = () => {
+                    const db = request.result;
+                    if (!db.objectStoreNames.contains(PLACES)) {
+                        const places = db.createObjectStore(PLACES, { keyPath: 'id' });
+                        places.createIndex('type', 'type');
+                    }
+                    if (!db.objectStoreNames.contains(OUTBOX)) {
+                        db.createObjectStore(OUTBOX, { keyPath: 'seq', autoIncrement: true });
+                    }
+                    if (!db.objectStoreNames.contains(IDMAP)) {
+                        db.createObjectStore(IDMAP, { keyPath: 'tempId' });
+                    }
+                };
+                request.onsuccess = () => resolve(request.result);
+                request.onerror = () => reject(request.error);
+            });
+        }
+        return dbPromise;
+    }
+
+    // 在一个事务里执行 fn(stores...)；fn 返回请求时，事务完成后返回该请求的结果
+    async function withStores(names, mode, fn) {
+        const db = await open();
+        return new Promise((resolve, reject) => {
+            const tx = db.transaction(names, mode);
+            const result = fn(...names.map(name => tx.objectStore(name)));
+            tx.oncomplete = () => resolve(result instanceof IDBRequest ? result.result : undefined);
+            tx.onerror = () => reject(tx.error);
+            tx.onabort = () => reject(tx.error);
+        });
+    }
+
+    async function getAllPlaces() {
+        try {
+            return await withStores([PLACES], 'readonly', store => store.getAll());
+        } catch (error) {
+            console.warn('读取本地地点失败:', error);
+            return [];
+        }
+    }
+
+    async function putPlaces(places) {
+        if (!places.length) return;
+        try {
+            await withStores([PLACES], 'readwrite', store => {
+                places.forEach(place => store.put(place));
+            });
+        } catch (error) {
+            console.warn('写入本地地点失败:', error);
+        }
+    }
+
+    async function deletePlaces(placeIds) {
+        if (!placeIds.length) return;
+        try {
+            await withStores([PLACES], 'readwrite', store => {
+                placeIds.forEach(id => store.delete(id));
+            });
+        } catch (error) {
+            console.warn('删除本地地点失败:', error);
+        }
+    }
+
+    // 临时 id 换成服务器 id：记录映射、删除旧记录、写入新记录在同一事务里完成
+    // place 为空表示该地点已在本地删除，只记录映射（队列里后续的 delete 还要用）
+    async function replacePlaceId(tempId, serverId, place) {
+        memoryIdMap[tempId] = serverId;
+        try {
+            await withStores([PLACES, IDMAP], 'readwrite', (places, idmap) => {
+                idmap.put({ tempId, serverId });
+                places.delete(tempId);
+                if (place) {
+                    places.put(place);
+                }
+            });
+        } catch (error) {
+            console.warn('替换本地地点 id 失败:', error);
+        }
+    }
+
+    async function getIdMap() {
+        try {
+            const rows = await withStores([IDMAP], 'readonly', store => store.getAll());
+            const map = Object.assign({}, memoryIdMap);
+            rows.forEach(row => { map[row.tempId] = row.serverId; });
+            return map;
+        } catch (error) {
+            return Object.assign({}, memoryIdMap);
+        }
+    }
+
+    // 队列清空后临时 id 不会再被引用，映射可以清掉
+    async function clearIdMap() {
+        memoryIdMap = {};
+        try {
+            await withStores([IDMAP], 'readwrite', store => {
+                store.clear();
+            });
+        } catch (error) {
+            console.warn('清理 id 映射失败:', error);
+        }
+    }
+
+    async function enqueue(entry) {
+        entry.queued_at = new Date().toISOString();
+        try {
+            await withStores([OUTBOX], 'readwrite', store => {
+                store.add(entry);
+            });
+        } catch (error) {
+            entry.seq = ++memoryOutboxSeq;
+            memoryOutbox.push(entry);
+        }
+    }
+
+    async function getOutbox() {
+        try {
+            const entries = await withStores([OUTBOX], 'readonly', store => store.getAll());
+            return entries.concat(memoryOutbox);
+        } catch (error) {
+            return memoryOutbox.slice();
+        }
+    }
+
+    async function removeOutboxEntry(entry) {
+        if (memoryOutbox.includes(entry)) {
+            memoryOutbox = memoryOutbox.filter(e => e !== entry);
+            return;
+        }
+        try {
+            await withStores([OUTBOX], 'readwrite', store => {
+                store.delete(entry.seq);
+            });
+        } catch (error) {
+            console.warn('移除离线队列记录失败:', error);
+        }
+    }
+
+    // 旧版缓存不区分账号，无法确定属于谁，升级后清掉一次（数据以服务器为准，同步后会重新缓存）
+    if (localStorage.getItem(LEGACY_KEY) !== null) {
+        localStorage.removeItem(LEGACY_KEY);
+    }
+
+    return {
+        useUser,
+        getAllPlaces,
+        putPlaces,
+        putPlace: place => putPlaces([place]),
+        deletePlaces,
+        deletePlace: placeId => deletePlaces([placeId]),
+        replacePlaceId,
+        getIdMap,
+        clearIdMap,
+        enqueue,
+        getOutbox,
+        removeOutboxEntry
+    };
+})();
+
+window.PlaceStore = PlaceStore;